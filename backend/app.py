@@ -2,7 +2,7 @@
 Flask API for Fantasy Cricket Team Builder
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import os
 import sys
@@ -26,7 +26,12 @@ logger.info("Environment variables loaded")
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from backend.utils.scraper import FirecrawlScraper
-from backend.config.firecrawl_config import FIRECRAWL_CONFIG
+from backend.utils.team_builder import TeamBuilderAgent
+from backend.utils.match_parser import parse_match_page
+from backend.utils.response_cache import (
+    ResponseCache, normalize_key, conditional_response, parse_request_params, parse_team_pair
+)
+from backend.config.firecrawl_config import FIRECRAWL_CONFIG, FANTASY_CONFIG
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -42,11 +47,30 @@ if not GEMINI_API_KEY:
 client = genai.Client(api_key=GEMINI_API_KEY)
 logger.info("Gemini client initialized")
 
-@app.route('/api/scrape', methods=['POST'])
+# Serialized, fingerprinted responses for repeat requests from the extension
+response_cache = ResponseCache(expiry=FIRECRAWL_CONFIG['cache']['expiry'])
+
+def cached_response(entry):
+    """Serve a cached entry, honouring If-None-Match and gzip Accept-Encoding."""
+    status, body, headers = conditional_response(
+        entry, request.if_none_match, 'gzip' in request.accept_encodings)
+    if status == 304:
+        logger.info(f"ETag matched, returning 304 for {request.path}")
+    return Response(body, status=status, headers=headers, mimetype='application/json')
+
+def request_params():
+    """Read request parameters, raising ValueError for malformed input."""
+    return parse_request_params(request.method, request.args.to_dict(), request.get_json(silent=True))
+
+@app.route('/api/scrape', methods=['GET', 'POST'])
 def scrape():
     try:
         logger.info("[API HIT] /api/scrape endpoint called")
-        data = request.json
+        try:
+            data = request_params()
+        except ValueError as e:
+            logger.error(f"Invalid scrape request: {str(e)}")
+            return jsonify({'error': str(e)}), 400
         url = data.get('url')
         options = data.get('options', {})
         logger.info(f"[API HIT] Scraping URL: {url}")
@@ -54,11 +78,15 @@ def scrape():
         if not url:
             logger.error("Missing URL in request")
             return jsonify({'error': 'URL is required'}), 400
-        logger.info("Calling FirecrawlScraper.scrape_url()")
-        scraper = FirecrawlScraper()
-        scraped_data = scraper.scrape_url(url, options)
+        cache_key = normalize_key('scrape', {'url': url, 'options': options})
+        entry = response_cache.get(cache_key)
+        if not entry:
+            logger.info("Calling FirecrawlScraper.scrape_url()")
+            scraper = FirecrawlScraper()
+            scraped_data = scraper.scrape_url(url, options)
+            entry = response_cache.set(cache_key, scraped_data)
         logger.info("Returning scraped data to client")
-        return jsonify(scraped_data)
+        return cached_response(entry)
     except Exception as e:
         logger.error(f"Error in scrape endpoint: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -93,13 +121,24 @@ def gemini():
             return jsonify({'match_url': response.text.strip()})
 
         elif mode == 'build_team':
-            prompt = (
-                "Given the following HTML content of a Cricbuzz match page and the user query, build an optimal fantasy cricket team for the match. "
-                "Return the team as a JSON object with player names and roles.\n"
-                f"User Query: {user_query}\n"
-                f"Match Page HTML:\n{html_content}"
-            )
-            logger.info("Prompting Gemini to build fantasy team from match page HTML and user query")
+            parsed = parse_match_page(html_content, FANTASY_CONFIG.get('default_credits', 8.0))
+            if parsed['players']:
+                logger.info(f"Parsed {len(parsed['players'])} players locally, sending structured match data")
+                prompt = (
+                    "Given the following structured data for a cricket match (squads, playing XI, roles and venue) and the user query, build an optimal fantasy cricket team for the match. "
+                    "Return the team as a JSON object with player names and roles.\n"
+                    f"User Query: {user_query}\n"
+                    f"Match Data:\n{json.dumps(parsed)}"
+                )
+            else:
+                logger.info("No squads found in page, falling back to raw HTML")
+                prompt = (
+                    "Given the following HTML content of a Cricbuzz match page and the user query, build an optimal fantasy cricket team for the match. "
+                    "Return the team as a JSON object with player names and roles.\n"
+                    f"User Query: {user_query}\n"
+                    f"Match Page HTML:\n{html_content}"
+                )
+            logger.info("Prompting Gemini to build fantasy team from match page data and user query")
             response = client.models.generate_content(
                 model="gemini-2.5-pro-preview-03-25",
                 contents=prompt
@@ -179,18 +218,27 @@ def clean_url(url):
     
     return url
 
-@app.route('/build-team', methods=['POST'])
+@app.route('/build-team', methods=['GET', 'POST'])
 def build_team():
     try:
         logger.info("API hit: /build-team")
-        data = request.get_json()
-        
         # Validate input
-        if not data or 'team1' not in data or 'team2' not in data:
-            return jsonify({'error': 'Invalid request data'}), 400
+        try:
+            data = request_params()
+            team1, team2 = parse_team_pair(data)
+        except ValueError as e:
+            logger.error(f"Invalid build-team request: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        cache_key = normalize_key('build-team', {
+            'teams': sorted([team1, team2]),
+            'options': data.get('options', {})
+        })
+        entry = response_cache.get(cache_key)
+        if entry:
+            logger.info(f"Returning cached team for {team1} vs {team2}")
+            return cached_response(entry)
 
-        team1 = data['team1']
-        team2 = data['team2']
         logger.info(f"Finding match for teams: {team1} vs {team2}")
 
         # Step 1: Scrape Cricbuzz homepage
@@ -244,7 +292,10 @@ Homepage Data:
         # Step 3: Scrape match data using FirecrawlScraper
         try:
             logger.info(f"Scraping match data from URL: {match_url}")
-            match_data = scraper.scrape_url(match_url, {})
+            match_data = scraper.scrape_match(match_url, {})
+            if not match_data['players']:
+                logger.warning("Parser found no squads, falling back to raw scrape")
+                match_data = scraper.scrape_url(match_url, {})
             if not match_data:
                 logger.error("No match data returned from scraper")
                 return jsonify({'error': 'No match data found'}), 404
@@ -309,7 +360,7 @@ Rules:
             # Add the match analysis and URL to the response
             result['match_analysis'] = match_analysis
             result['match_url'] = match_url
-            return jsonify(result)
+            return cached_response(response_cache.set(cache_key, result))
             
         except (json.JSONDecodeError, ValueError) as e:
             logger.error(f"Failed to parse or validate Gemini response: {str(e)}")
@@ -320,6 +371,27 @@ Rules:
         logger.error(f"Error in /build-team: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/history/scorecard', methods=['POST'])
+def ingest_scorecard():
+    try:
+        logger.info("[API HIT] /api/history/scorecard endpoint called")
+        data = request.get_json(silent=True) or {}
+        url = data.get('url')
+        if not url or not isinstance(url, str):
+            logger.error("Missing URL in request")
+            return jsonify({'error': 'URL is required'}), 400
+        agent = TeamBuilderAgent()
+        parsed = FirecrawlScraper().scrape_scorecard(url, agent.history)
+        logger.info(f"Ingested {parsed['ingested']} player rows from {url}")
+        return jsonify({
+            'match': parsed['match'],
+            'players': len(parsed['innings']),
+            'ingested': parsed['ingested']
+        })
+    except Exception as e:
+        logger.error(f"Error in scorecard ingest endpoint: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,322 @@
+import json
+import os
+
+from utils.match_parser import parse_match_page, parse_scorecard
+
+MARKDOWN_PAGE = """
+# Kolkata Knight Riders vs Gujarat Titans, 39th Match - Live Cricket Score, Commentary
+
+Series: [Indian Premier League 2025](https://x/series) Venue: [Eden Gardens, Kolkata](https://x/venue) Date & Time: Apr 21, 07:30 PM LOCAL
+
+**What to expect:** Good batting pitch.
+
+**Kolkata Knight Riders**
+
+**Probable XII:** Sunil Narine, Quinton de Kock(wk), Ajinkya Rahane(c)
+
+**Gujarat Titans**
+
+**Probable XII:** Shubman Gill(c), Jos Buttler(wk), Ishant Sharma/Washington Sundar
+
+**Kolkata Knight Riders** Squad: Quinton de Kock(w), Sunil Narine, Ajinkya Rahane(c), Rinku Singh
+
+**Gujarat Titans** Squad: Shubman Gill(c), Jos Buttler(w), Rashid Khan
+"""
+
+ROLE_PAGE = """
+# India vs Australia, 1st Test
+
+**India**
+
+Batters
+- Virat Kohli
+- Rohit Sharma (c)
+![img](http://x/y.jpg)
+Read more
+
+Bowler
+Jasprit Bumrah
+Read more
+IPL 2025 Points Table
+
+**Australia**
+
+Wicket Keeper
+[Alex Carey](http://x/carey)
+"""
+
+HTML_PAGE = """<html><head><script>var x = "<b>India</b>";</script></head><body>
+<h1>India vs Australia, 1st Test</h1>
+<p>Venue: Perth Stadium</p>
+<p><b>India</b></p><p>BATSMEN</p><div>Virat Kohli</div><div>Rohit Sharma (c)</div>
+<p>BOWLER</p><div>Jasprit Bumrah</div>
+<p><b>Australia</b> Squad: Pat Cummins(c), Alex Carey(wk)</p>
+</body></html>"""
+
+
+SCORECARD_PAGE = """
+# Kolkata Knight Riders vs Gujarat Titans, 39th Match - Scorecard
+
+Gujarat Titans won by 39 runs
+
+Gujarat Titans Innings
+
+198-3 (20 Ov)
+
+Batter
+
+R
+
+B
+
+4s
+
+6s
+
+SR
+
+[Sai Sudharsan](https://www.cricbuzz.com/profiles/1/sai-sudharsan)
+
+c Gurbaz b Russell
+
+52
+
+36
+
+6
+
+1
+
+144.44
+
+[Shubman Gill (c)](https://www.cricbuzz.com/profiles/2/shubman-gill)
+
+run out (Rinku Singh/Narine)
+
+90
+
+55
+
+10
+
+3
+
+163.64
+
+[Jos Buttler (wk)](https://www.cricbuzz.com/profiles/3/jos-buttler)
+
+not out
+
+41*
+
+23
+
+8
+
+0
+
+178.26
+
+Extras
+
+4
+
+Bowler
+
+O
+
+M
+
+R
+
+W
+
+NB
+
+WD
+
+ECO
+
+[Andre Russell](https://www.cricbuzz.com/profiles/4/andre-russell)
+
+4
+
+1
+
+39
+
+1
+
+0
+
+0
+
+9.75
+
+Kolkata Knight Riders Innings
+
+159-8 (20 Ov)
+
+Batter
+
+R
+
+B
+
+4s
+
+6s
+
+SR
+
+[Rahmanullah Gurbaz (wk)](https://www.cricbuzz.com/profiles/5/gurbaz)
+
+st Buttler b Rashid Khan
+
+1
+
+4
+
+0
+
+0
+
+25.00
+
+[Andre Russell](https://www.cricbuzz.com/profiles/4/andre-russell)
+
+c & b Rashid Khan
+
+21
+
+15
+
+1
+
+2
+
+140.00
+
+Extras
+
+2
+
+Bowler
+
+O
+
+M
+
+R
+
+W
+
+NB
+
+WD
+
+ECO
+
+[Rashid Khan](https://www.cricbuzz.com/profiles/6/rashid-khan)
+
+4
+
+0
+
+25
+
+2
+
+0
+
+0
+
+6.25
+
+Match Info
+
+Venue
+
+Eden Gardens, Kolkata
+"""
+
+
+def by_name(parsed):
+    return {p['name']: p for p in parsed['players']}
+
+
+def test_markdown_match_info_squads_and_xi():
+    parsed = parse_match_page(MARKDOWN_PAGE, default_credits=9.0)
+    match = parsed['match']
+    assert (match['team1'], match['team2']) == ('Kolkata Knight Riders', 'Gujarat Titans')
+    assert match['venue'] == 'Eden Gardens, Kolkata'
+    assert match['date'] == 'Apr 21, 07:30 PM LOCAL'
+    assert match['pitch'] == 'Good batting pitch.'
+
+    players = by_name(parsed)
+    assert set(players) == {'Sunil Narine', 'Quinton de Kock', 'Ajinkya Rahane', 'Rinku Singh',
+                            'Shubman Gill', 'Jos Buttler', 'Ishant Sharma', 'Washington Sundar',
+                            'Rashid Khan'}
+    assert players['Quinton de Kock']['role'] == 'WK'
+    assert players['Ajinkya Rahane']['is_captain']
+    assert players['Rashid Khan']['team'] == 'Gujarat Titans'
+    assert players['Sunil Narine']['credits'] == 9.0
+    assert parsed['playing_xi']['Gujarat Titans'] == ['Shubman Gill', 'Jos Buttler', 'Ishant Sharma']
+    assert players['Ishant Sharma']['in_playing_xi']
+    assert not players['Washington Sundar']['in_playing_xi']
+    assert not players['Rinku Singh']['in_playing_xi']
+
+
+def test_role_sections_skip_page_furniture():
+    players = by_name(parse_match_page(ROLE_PAGE))
+    assert set(players) == {'Virat Kohli', 'Rohit Sharma', 'Jasprit Bumrah'}
+    assert players['Virat Kohli']['role'] == 'BAT'
+    assert players['Rohit Sharma']['is_captain']
+    assert players['Jasprit Bumrah']['role'] == 'BOWL'
+
+
+def test_html_page():
+    parsed = parse_match_page(HTML_PAGE)
+    assert parsed['match']['venue'] == 'Perth Stadium'
+    players = by_name(parsed)
+    assert set(players) == {'Virat Kohli', 'Rohit Sharma', 'Jasprit Bumrah', 'Pat Cummins', 'Alex Carey'}
+    assert players['Virat Kohli']['role'] == 'BAT'
+    assert players['Alex Carey']['role'] == 'WK'
+    assert players['Pat Cummins']['role'] is None
+
+
+def test_cached_cricbuzz_page():
+    path = os.path.join(os.path.dirname(__file__), 'data', 'cache', '97dfe989e29aabf980d2cdffe3001c0c.json')
+    with open(path) as f:
+        markdown = json.load(f)['content']['data']['markdown']
+    parsed = parse_match_page(markdown)
+    assert parsed['match']['venue'] == 'Eden Gardens, Kolkata'
+    assert len(parsed['players']) == 45
+    assert len(parsed['playing_xi']['Kolkata Knight Riders']) == 12
+
+
+def test_scorecard_stats_and_fielding():
+    parsed = parse_scorecard(SCORECARD_PAGE)
+    assert parsed['match']['venue'] == 'Eden Gardens, Kolkata'
+    assert parsed['match']['result'] == 'Gujarat Titans won by 39 runs'
+
+    players = {p['name']: p for p in parsed['innings']}
+    assert players['Jos Buttler']['runs'] == 41
+    assert players['Jos Buttler']['stumpings'] == 1
+    assert players['Shubman Gill']['fours'] == 10
+    assert players['Shubman Gill']['opponent'] == 'Kolkata Knight Riders'
+    # Russell bats and bowls; both are folded into one match row
+    assert players['Andre Russell']['runs'] == 21
+    assert players['Andre Russell']['wickets'] == 1
+    assert players['Andre Russell']['maidens'] == 1
+    assert players['Andre Russell']['team'] == 'Kolkata Knight Riders'
+    assert players['Rashid Khan']['wickets'] == 2
+    assert players['Rashid Khan']['catches'] == 1
+    assert players['Rashid Khan']['opponent'] == 'Kolkata Knight Riders'
+    assert players['Rahmanullah Gurbaz']['catches'] == 1
+    assert players['Rinku Singh']['run_outs'] == 1
+
+
+def test_scorecard_in_progress_has_no_result():
+    page = SCORECARD_PAGE.replace('Gujarat Titans won by 39 runs', 'Kolkata Knight Riders need 40 runs')
+    assert parse_scorecard(page)['match']['result'] is None
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from utils.player_history import PlayerHistoryStore
+
+
+def score(stats):
+    return stats['runs'] + 25 * stats['wickets']
+
+
+def make_store(path, window=3):
+    return PlayerHistoryStore(str(path), window=window, scorer=score)
+
+
+def test_ingest_reload_and_get_form(tmp_path):
+    store = make_store(tmp_path)
+    assert store.ingest_scorecard('m1', 'Eden Gardens', [
+        {'name': 'Rinku Singh', 'opponent': 'GT', 'runs': '40*'},
+        {'name': 'Rashid Khan', 'opponent': 'KKR', 'wickets': 2},
+    ]) == 2
+    store.ingest_scorecard('m2', 'Wankhede', [{'name': 'Rinku Singh', 'opponent': 'MI', 'runs': 10}])
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.row_count() == 3
+    form = reloaded.get_form('Rinku Singh', venue='Wankhede', opponent='GT')
+    assert form['last_points'] == [40.0, 10.0]
+    assert form['recent_average'] == 25.0
+    assert form['venue_average'] == 10.0
+    assert form['opponent_average'] == 40.0
+    assert reloaded.get_form('Rashid Khan')['last_points'] == [50.0]
+    assert reloaded.get_form('Unknown') is None
+
+
+def test_duplicate_ingest_is_ignored(tmp_path):
+    store = make_store(tmp_path)
+    innings = [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40}]
+    assert store.ingest_scorecard('m1', 'Eden Gardens', innings) == 1
+    assert store.ingest_scorecard('m1', 'Eden Gardens', innings) == 0
+    assert make_store(tmp_path).get_form('Rinku Singh')['innings'] == 1
+
+
+def test_bad_entry_leaves_store_unchanged(tmp_path):
+    store = make_store(tmp_path)
+    with pytest.raises(ValueError):
+        store.ingest_scorecard('m1', 'Eden Gardens', [
+            {'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40},
+            {'name': 'Andre Russell', 'opponent': 'GT', 'runs': 'DNB'},
+        ])
+    assert store.get_form('Rinku Singh') is None
+    assert store.row_count() == 0
+
+    fixed = [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40}]
+    assert store.ingest_scorecard('m1', 'Eden Gardens', fixed) == 1
+
+
+def test_stale_aggregates_are_rebuilt(tmp_path):
+    store = make_store(tmp_path)
+    store.ingest_scorecard('m1', 'Eden Gardens', [
+        {'name': 'Rinku Singh', 'opponent': 'GT', 'runs': runs} for runs in (10, 20, 30, 40)
+    ])
+    # A different window invalidates the saved aggregates
+    assert make_store(tmp_path, window=2).get_form('Rinku Singh')['last_points'] == [30.0, 40.0]
+
+    with open(tmp_path / 'aggregates.json', 'w') as f:
+        f.write('{not json')
+    assert make_store(tmp_path).get_form('Rinku Singh')['innings'] == 4
+
+
+def test_uncommitted_rows_are_dropped_on_load(tmp_path):
+    store = make_store(tmp_path)
+    store.ingest_scorecard('m1', 'Eden Gardens', [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40}])
+
+    # Simulate a crash after some columns were appended but before meta.json
+    with open(tmp_path / 'player_id.bin', 'ab') as f:
+        f.write((99).to_bytes(4, 'little'))
+    with open(tmp_path / 'points.bin', 'ab') as f:
+        f.write(bytes(8))
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.row_count() == 1
+    assert reloaded.get_form('Rinku Singh')['innings'] == 1
+    assert os.path.getsize(tmp_path / 'player_id.bin') == 4
+
+    assert reloaded.ingest_scorecard('m2', 'Eden Gardens', [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 20}]) == 1
+    assert make_store(tmp_path).get_form('Rinku Singh')['last_points'] == [40.0, 20.0]
+
+
+def test_rows_without_meta_are_dropped_on_load(tmp_path):
+    store = make_store(tmp_path)
+    store.ingest_scorecard('m1', 'Eden Gardens', [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40}])
+
+    # Simulate a crash during the first ingest, before meta.json was written
+    os.remove(tmp_path / 'meta.json')
+    os.remove(tmp_path / 'aggregates.json')
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.row_count() == 0
+    assert reloaded.get_form('Rinku Singh') is None
+    assert reloaded.ingest_scorecard('m1', 'Eden Gardens', [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40}]) == 1
+
+    form = make_store(tmp_path, window=4).get_form('Rinku Singh')
+    assert form['innings'] == 1
+    assert form['last_points'] == [40.0]
+
+
+def test_unknown_ids_do_not_break_constructor(tmp_path):
+    store = make_store(tmp_path)
+    store.ingest_scorecard('m1', 'Eden Gardens', [{'name': 'Rinku Singh', 'opponent': 'GT', 'runs': 40}])
+
+    with open(tmp_path / 'meta.json') as f:
+        meta = json.load(f)
+    meta['players'] = []
+    with open(tmp_path / 'meta.json', 'w') as f:
+        json.dump(meta, f)
+    os.remove(tmp_path / 'aggregates.json')
+
+    assert make_store(tmp_path).get_form('Rinku Singh') is None
@@ -0,0 +1,116 @@
+import gzip
+import json
+import threading
+
+import pytest
+
+from utils.response_cache import (
+    ResponseCache, normalize_key, conditional_response, parse_request_params, parse_team_pair
+)
+
+
+def test_normalize_key_ignores_param_order():
+    assert normalize_key('scrape', {'url': 'u', 'options': {'a': 1, 'b': 2}}) == \
+        normalize_key('scrape', {'options': {'b': 2, 'a': 1}, 'url': 'u'})
+
+
+def test_etag_is_deterministic_and_large_bodies_are_gzipped():
+    cache = ResponseCache(gzip_min_size=100)
+    small = cache.set('small', {'b': 1, 'a': 2})
+    assert small['gzip'] is None
+    assert ResponseCache().set('other', {'a': 2, 'b': 1})['etag'] == small['etag']
+
+    large = cache.set('large', {'markdown': 'x' * 1000})
+    assert json.loads(gzip.decompress(large['gzip'])) == {'markdown': 'x' * 1000}
+    assert cache.get('large') is large
+
+
+def test_expiry_and_eviction():
+    cache = ResponseCache(expiry=-1)
+    cache.set('k', {})
+    assert cache.get('k') is None
+
+    cache = ResponseCache(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, {'key': key})
+    assert cache.get('a') is None
+    assert cache.get('c')['etag']
+
+
+def test_concurrent_sets_with_eviction():
+    cache = ResponseCache(max_entries=8)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(200):
+                cache.set(f'{n}-{i}', {'i': i})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def large_entry():
+    return ResponseCache(gzip_min_size=100).set('k', {'markdown': 'x' * 1000})
+
+
+def test_conditional_response_serves_identity_and_gzip_variants():
+    entry = large_entry()
+    status, body, headers = conditional_response(entry, set(), accept_gzip=False)
+    assert (status, body) == (200, entry['body'])
+    assert headers['ETag'] == f'"{entry["etag"]}"'
+    assert 'Content-Encoding' not in headers
+
+    status, body, headers = conditional_response(entry, set(), accept_gzip=True)
+    assert (status, body) == (200, entry['gzip'])
+    assert headers['ETag'] == f'"{entry["etag"]}-gzip"'
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Vary'] == 'Accept-Encoding'
+
+
+def test_conditional_response_304_on_either_tag():
+    entry = large_entry()
+    for tag in (entry['etag'], f"{entry['etag']}-gzip"):
+        for accept_gzip in (True, False):
+            status, body, _ = conditional_response(entry, {tag}, accept_gzip)
+            assert (status, body) == (304, None)
+    assert conditional_response(entry, {'stale'}, True)[0] == 200
+
+
+def test_small_entries_are_never_gzipped():
+    entry = ResponseCache().set('k', {'a': 1})
+    status, body, headers = conditional_response(entry, set(), accept_gzip=True)
+    assert body == entry['body']
+    assert headers['ETag'] == f'"{entry["etag"]}"'
+
+
+def test_parse_request_params_get_and_post():
+    assert parse_request_params('GET', {'url': 'u', 'options': '{"a": 1}'}, None) == \
+        {'url': 'u', 'options': {'a': 1}}
+    assert parse_request_params('GET', {'team1': 'KKR', 'team2': 'GT'}, None) == {'team1': 'KKR', 'team2': 'GT'}
+    assert parse_request_params('POST', {}, {'url': 'u'}) == {'url': 'u'}
+    assert parse_request_params('POST', {}, None) == {}
+
+
+@pytest.mark.parametrize('method,args,body', [
+    ('GET', {'options': '{bad'}, None),
+    ('GET', {'options': '[1]'}, None),
+    ('POST', {}, ['not', 'an', 'object']),
+    ('POST', {}, {'options': 'x'}),
+])
+def test_parse_request_params_rejects_malformed_input(method, args, body):
+    with pytest.raises(ValueError):
+        parse_request_params(method, args, body)
+
+
+def test_parse_team_pair():
+    assert parse_team_pair({'team1': ' kkr ', 'team2': 'GT'}) == ('KKR', 'GT')
+    for params in ({}, {'team1': 'KKR'}, {'team1': 1, 'team2': 'GT'}, {'team1': 'KKR', 'team2': None}):
+        with pytest.raises(ValueError):
+            parse_team_pair(params)
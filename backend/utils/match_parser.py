@@ -0,0 +1,394 @@
+"""
+Parse squads, playing XI, roles and venue out of a scraped match page
+"""
+
+import re
+import logging
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Iterable, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TITLE_RE = re.compile(r'^#\s+(.+?)\s+vs\s+(.+?),')
+VENUE_RE = re.compile(r'Venue:\s*\[?([^\]\(]+)')
+DATE_RE = re.compile(r'Date & Time:\s*(.+)$')
+BOLD_RE = re.compile(r'^\*\*(.+?):?\*\*\s*(.*)$')
+MARKER_RE = re.compile(r'\s*\((wk|w|c|c & wk|c & w)\)', re.IGNORECASE)
+NAME_TOKEN_RE = re.compile(r"^[A-Z][A-Za-z'.\-]*$")
+BULLET_RE = re.compile(r'^[-*+]\s+')
+
+# Lowercase name particles, e.g. "Quinton de Kock"
+NAME_PARTICLES = {'de', 'du', 'da', 'di', 'van', 'der', 'von', 'ul', 'al', 'bin', 'le'}
+
+# Headings used by squad pages to group players by role
+ROLE_HEADINGS = {
+    'batsmen': 'BAT',
+    'batters': 'BAT',
+    'batter': 'BAT',
+    'all rounder': 'AR',
+    'all rounders': 'AR',
+    'all-rounders': 'AR',
+    'wicket keeper': 'WK',
+    'wicket keepers': 'WK',
+    'bowler': 'BOWL',
+    'bowlers': 'BOWL',
+}
+
+XI_LABELS = ('playing xi', 'probable xi', 'probable xii')
+
+# Scorecard tables
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+NUMBER_RE = re.compile(r'^\d+(\.\d+)?\*?$')
+INNINGS_RE = re.compile(r'^(.+?)\s+(?:\d(?:st|nd|rd|th)\s+)?Innings(?:\s+[\d\-/(].*)?$', re.IGNORECASE)
+RESULT_RE = re.compile(r'\bwon by\b|\bmatch tied\b|\bno result\b', re.IGNORECASE)
+BATTING_COLUMNS = {'r', 'b', '4s', '6s', 'sr'}
+BOWLING_COLUMNS = {'o', 'm', 'r', 'w', 'nb', 'wd', 'eco'}
+BATTING_END = ('extras', 'total', 'did not bat', 'yet to bat', 'fall of wickets')
+
+
+class _TextLines(HTMLParser):
+    """Flatten HTML into markdown-like lines the line parser understands"""
+
+    BLOCK_TAGS = {'p', 'div', 'li', 'br', 'tr', 'h1', 'h2', 'h3', 'h4', 'section'}
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self._current = []
+        self._skip = 0
+
+    def _flush(self):
+        line = ''.join(self._current).strip()
+        if line:
+            self.lines.append(line)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+            if tag == 'h1':
+                self._current.append('# ')
+        elif tag in ('b', 'strong'):
+            self._current.append('**')
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+        elif tag in ('b', 'strong'):
+            self._current.append('**')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._current.append(data.replace('\n', ' '))
+
+
+def _html_lines(html: str) -> List[str]:
+    parser = _TextLines()
+    parser.feed(html)
+    parser.close()
+    parser._flush()
+    return parser.lines
+
+
+def _split_names(text: str) -> List[str]:
+    """Split a comma separated player list, keeping role markers"""
+    text = text.rstrip('.').replace('\\', '')
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def _is_player_name(name: str) -> bool:
+    """Check a line looks like a player name rather than page furniture"""
+    tokens = name.split()
+    if not 1 <= len(tokens) <= 4 or not NAME_TOKEN_RE.match(tokens[0]):
+        return False
+    return all(NAME_TOKEN_RE.match(t) or t in NAME_PARTICLES for t in tokens[1:])
+
+
+def _make_player(raw: str, team: str, role: Optional[str], default_credits: float) -> Dict[str, Any]:
+    markers = [m.lower() for m in MARKER_RE.findall(raw)]
+    name = MARKER_RE.sub('', raw).strip()
+    if any('w' in m for m in markers):
+        role = 'WK'
+    return {
+        'name': name,
+        'team': team,
+        'role': role,
+        'credits': default_credits,
+        'is_captain': any(m.startswith('c') for m in markers),
+        'recent_form': None,
+        'last_3_matches': [],
+    }
+
+
+def parse_match_page(content: str, default_credits: float = 8.0) -> Dict[str, Any]:
+    """
+    Extract match info and the player list from scraped markdown or HTML.
+
+    Makes a single pass over the page lines and returns
+    {'match': {...}, 'players': [...]} in the shape TeamBuilderAgent expects.
+    Roles come from role headings and (wk) markers only, so 'role' is None
+    for players the page doesn't classify.
+    """
+    lines: Iterable[str]
+    if content.lstrip().startswith('<'):
+        lines = _html_lines(content)
+    else:
+        lines = content.splitlines()
+
+    match = {'team1': None, 'team2': None, 'venue': None, 'date': None, 'pitch': None}
+    squads: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    playing_xi: Dict[str, List[str]] = {}
+    current_team = None
+    current_role = None
+
+    def squad_for(team):
+        return squads.setdefault(team, {})
+
+    for raw_line in lines:
+        line = raw_line.replace('\xa0', ' ').strip()
+        if not line:
+            current_role = None
+            continue
+
+        if match['team1'] is None:
+            title = TITLE_RE.match(line)
+            if title:
+                match['team1'], match['team2'] = title.group(1).strip(), title.group(2).strip()
+                continue
+
+        if match['venue'] is None and 'Venue:' in line:
+            venue = VENUE_RE.search(line)
+            if venue:
+                match['venue'] = venue.group(1).strip()
+            date = DATE_RE.search(line)
+            if date:
+                match['date'] = date.group(1).strip()
+            continue
+
+        heading = line.strip('*#: ').lower()
+        if heading in ROLE_HEADINGS:
+            current_role = ROLE_HEADINGS[heading]
+            continue
+
+        # Headings, links and images end a role section
+        if line.startswith(('#', '[', '!')) or '](' in line:
+            current_role = None
+            continue
+
+        bold = BOLD_RE.match(line)
+        if not bold:
+            if current_team and current_role:
+                player = _make_player(BULLET_RE.sub('', line), current_team, current_role, default_credits)
+                if _is_player_name(player['name']):
+                    squad_for(current_team).setdefault(player['name'], player)
+                else:
+                    current_role = None
+            continue
+
+        label, rest = bold.group(1).strip().rstrip(':'), bold.group(2).strip()
+        label_lower = label.lower()
+
+        if label_lower == 'what to expect' and rest:
+            match['pitch'] = rest
+        elif label_lower in XI_LABELS and current_team and rest:
+            names = [name.split('/')[0] for name in _split_names(rest)]
+            playing_xi[current_team] = [MARKER_RE.sub('', name).strip() for name in names]
+            for name in _split_names(rest.replace('/', ',')):
+                player = _make_player(name, current_team, None, default_credits)
+                squad_for(current_team).setdefault(player['name'], player)
+        elif label in (match['team1'], match['team2']):
+            current_team = label
+            current_role = None
+            if rest.lower().startswith('squad:'):
+                for name in _split_names(rest[len('squad:'):]):
+                    player = _make_player(name, current_team, None, default_credits)
+                    existing = squad_for(current_team).setdefault(player['name'], player)
+                    if player['role'] and not existing['role']:
+                        existing['role'] = player['role']
+        else:
+            current_role = None
+
+    players = []
+    for team, members in squads.items():
+        xi = set(playing_xi.get(team, []))
+        for player in members.values():
+            player['in_playing_xi'] = player['name'] in xi
+            players.append(player)
+
+    logger.info(f"Parsed {len(players)} players for {match['team1']} vs {match['team2']}")
+    return {'match': match, 'playing_xi': playing_xi, 'players': players}
+
+
+def _scorecard_tokens(content: str) -> List[str]:
+    """Non-empty scorecard cells with links, bold and escapes stripped"""
+    lines = _html_lines(content) if content.lstrip().startswith('<') else content.splitlines()
+    tokens = []
+    for raw_line in lines:
+        line = LINK_RE.sub(r'\1', raw_line.replace('\xa0', ' '))
+        line = BULLET_RE.sub('', line.replace('**', '').replace('\\', '').strip()).strip()
+        if line:
+            tokens.append(line)
+    return tokens
+
+
+def _table_columns(tokens: List[str], start: int, allowed: set) -> List[str]:
+    """Read the column labels following a table header cell"""
+    columns = []
+    i = start + 1
+    while i < len(tokens) and tokens[i].lower() in allowed:
+        columns.append(tokens[i].lower())
+        i += 1
+    return columns
+
+
+def _table_row(tokens: List[str], start: int, count: int) -> Optional[List[str]]:
+    cells = tokens[start:start + count]
+    if len(cells) == count and all(NUMBER_RE.match(cell) for cell in cells):
+        return cells
+    return None
+
+
+def _credit_fielding(dismissal: str) -> List[tuple]:
+    """Work out (fielder, stat) credits from a dismissal like 'c Tewatia b Rashid Khan'"""
+    dismissal = dismissal.replace('(sub)', '').strip()
+    caught_and_bowled = re.match(r'^c\s*&\s*b\s+(.+)$', dismissal)
+    if caught_and_bowled:
+        return [(caught_and_bowled.group(1), 'catches')]
+    caught = re.match(r'^c\s+(.+?)\s+b\s+.+$', dismissal)
+    if caught:
+        return [(caught.group(1), 'catches')]
+    stumped = re.match(r'^st\s+(.+?)\s+b\s+.+$', dismissal)
+    if stumped:
+        return [(stumped.group(1), 'stumpings')]
+    run_out = re.match(r'^run out\s*\((.+?)\)', dismissal, re.IGNORECASE)
+    if run_out:
+        return [(run_out.group(1).split('/')[0].strip(), 'run_outs')]
+    return []
+
+
+def _resolve_name(short_name: str, candidates: Iterable[str]) -> str:
+    """Match a scorecard short name ('Tewatia') to a full player name"""
+    short_name = MARKER_RE.sub('', short_name).strip()
+    for name in candidates:
+        if name == short_name:
+            return name
+    for name in candidates:
+        if name.endswith(' ' + short_name) or short_name.endswith(' ' + name.split()[-1]):
+            return name
+    return short_name
+
+
+def parse_scorecard(content: str) -> Dict[str, Any]:
+    """
+    Extract per-player match stats from a scraped scorecard page.
+
+    Walks the batting and bowling tables of each innings and folds
+    dismissals into catches, stumpings and run outs. Returns
+    {'match': {...}, 'innings': [...]} with one dict per player per match,
+    ready for PlayerHistoryStore.ingest_scorecard. 'result' stays None
+    while the match is still in progress.
+    """
+    tokens = _scorecard_tokens(content)
+    match = {'team1': None, 'team2': None, 'venue': None, 'result': None}
+    teams: List[str] = []
+    stats: Dict[str, Dict[str, Any]] = {}
+    fielding: List[tuple] = []
+    batting_team = None
+
+    def player_stats(name, team):
+        return stats.setdefault(name, {
+            'name': name, 'team': team, 'runs': 0, 'balls': 0, 'fours': 0, 'sixes': 0,
+            'wickets': 0, 'maidens': 0, 'catches': 0, 'stumpings': 0, 'run_outs': 0,
+        })
+
+    def other_team(team):
+        others = [t for t in teams if t != team]
+        return others[0] if len(others) == 1 else None
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        lower = token.lower()
+
+        title = TITLE_RE.match(token)
+        if title and match['team1'] is None:
+            match['team1'], match['team2'] = title.group(1).strip(), title.group(2).strip()
+            teams.extend(t for t in (match['team1'], match['team2']) if t not in teams)
+        elif match['result'] is None and RESULT_RE.search(token):
+            match['result'] = token
+        elif match['venue'] is None and 'Venue:' in token:
+            venue = VENUE_RE.search(token)
+            match['venue'] = venue.group(1).strip() if venue else None
+        elif match['venue'] is None and lower == 'venue' and i + 1 < len(tokens):
+            match['venue'] = tokens[i + 1]
+            i += 1
+        elif INNINGS_RE.match(token):
+            team = INNINGS_RE.match(token).group(1).strip()
+            # Once the title names both sides, ignore prose that mentions an innings
+            if match['team1'] is None or team in teams:
+                batting_team = team
+                if team not in teams:
+                    teams.append(team)
+        elif lower in ('batter', 'batsman') and batting_team:
+            columns = _table_columns(tokens, i, BATTING_COLUMNS)
+            i += len(columns) + 1
+            while columns and i < len(tokens) and not tokens[i].lower().startswith(BATTING_END):
+                name = MARKER_RE.sub('', tokens[i]).strip()
+                j, dismissal = i + 1, None
+                if j < len(tokens) and not NUMBER_RE.match(tokens[j]):
+                    dismissal, j = tokens[j], j + 1
+                row = _table_row(tokens, j, len(columns))
+                if not _is_player_name(name) or row is None:
+                    break
+                cells = dict(zip(columns, row))
+                batter = player_stats(name, batting_team)
+                batter['runs'] += int(cells.get('r', '0').rstrip('*'))
+                batter['balls'] += int(cells.get('b', '0'))
+                batter['fours'] += int(cells.get('4s', '0'))
+                batter['sixes'] += int(cells.get('6s', '0'))
+                if dismissal:
+                    fielding.extend((batting_team, fielder, stat) for fielder, stat in _credit_fielding(dismissal))
+                i = j + len(columns)
+            continue
+        elif lower == 'bowler' and batting_team:
+            columns = _table_columns(tokens, i, BOWLING_COLUMNS)
+            i += len(columns) + 1
+            while columns and i < len(tokens):
+                name = MARKER_RE.sub('', tokens[i]).strip()
+                row = _table_row(tokens, i + 1, len(columns))
+                if not _is_player_name(name) or row is None:
+                    break
+                cells = dict(zip(columns, row))
+                bowler = player_stats(name, other_team(batting_team))
+                bowler['wickets'] += int(cells.get('w', '0'))
+                bowler['maidens'] += int(cells.get('m', '0'))
+                if bowler['team'] is None:
+                    bowler['bowled_against'] = batting_team
+                i += 1 + len(columns)
+            continue
+        i += 1
+
+    # Bowlers seen before the second team was known
+    for player in stats.values():
+        if player['team'] is None:
+            player['team'] = other_team(player.pop('bowled_against', None))
+
+    for team_batting, fielder, stat in fielding:
+        fielding_team = other_team(team_batting)
+        candidates = [name for name, s in stats.items() if s['team'] == fielding_team]
+        player_stats(_resolve_name(fielder, candidates), fielding_team)[stat] += 1
+
+    innings = []
+    for player in stats.values():
+        opponent = other_team(player['team'])
+        if player['team'] and opponent:
+            player['opponent'] = opponent
+            innings.append(player)
+
+    logger.info(f"Parsed scorecard stats for {len(innings)} players")
+    return {'match': match, 'innings': innings}
@@ -0,0 +1,301 @@
+"""
+Local player-history store with precomputed rolling form
+"""
+
+import os
+import json
+import mmap
+import logging
+from array import array
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Column name -> array typecode. Every column file holds one fixed-width
+# value per ingested innings, so row i of each file describes the same innings.
+COLUMNS = {
+    'player_id': 'i',
+    'match_id': 'i',
+    'venue_id': 'i',
+    'opponent_id': 'i',
+    'runs': 'i',
+    'balls': 'i',
+    'fours': 'i',
+    'sixes': 'i',
+    'wickets': 'i',
+    'maidens': 'i',
+    'catches': 'i',
+    'stumpings': 'i',
+    'run_outs': 'i',
+    'points': 'd',
+}
+
+STAT_COLUMNS = ['runs', 'balls', 'fours', 'sixes', 'wickets', 'maidens',
+                'catches', 'stumpings', 'run_outs']
+
+KINDS = ('players', 'venues', 'opponents', 'matches')
+
+
+def _to_int(value: Any) -> int:
+    """Convert a scorecard cell to int, accepting not-out markers like '12*'"""
+    if value is None or value == '' or value == '-':
+        return 0
+    if isinstance(value, str):
+        value = value.strip().rstrip('*')
+    return int(value)
+
+
+class PlayerHistoryStore:
+    """
+    Append-only per-innings history with rolling form aggregates.
+
+    Innings rows are written to the column files first and only counted as
+    committed once meta.json (written atomically) records the new row count,
+    so a crash mid-ingest leaves trailing rows that are truncated on load.
+    FirecrawlScraper.scrape_scorecard feeds it from scraped scorecards.
+    """
+
+    def __init__(self, directory: str = None, window: int = 5,
+                 scorer: Optional[Callable[[Dict], float]] = None):
+        logger.info("Initializing PlayerHistoryStore")
+        self.directory = directory or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'data', 'history')
+        self.window = window
+        self.scorer = scorer
+        os.makedirs(self.directory, exist_ok=True)
+        self._meta_path = os.path.join(self.directory, 'meta.json')
+        self._aggregates_path = os.path.join(self.directory, 'aggregates.json')
+        self._load()
+        logger.debug(f"History directory: {self.directory}")
+
+    def _column_path(self, column: str) -> str:
+        """Get the file path for a column"""
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _column_length(self, column: str) -> int:
+        path = self._column_path(column)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // array(COLUMNS[column]).itemsize
+
+    def _truncate_columns(self, rows: int):
+        """Cut every column file back to the given number of rows"""
+        for column, typecode in COLUMNS.items():
+            path = self._column_path(column)
+            size = rows * array(typecode).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        """Write JSON via a temp file so readers never see a partial file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        """Load the string dictionaries and rolling aggregates from disk"""
+        self.meta = {kind: [] for kind in KINDS}
+        # Without meta.json no ingest ever committed, e.g. a crash mid first ingest
+        rows = 0
+        if os.path.exists(self._meta_path):
+            try:
+                with open(self._meta_path, 'r') as f:
+                    data = json.load(f)
+                for kind in KINDS:
+                    self.meta[kind] = list(data.get(kind, []))
+                rows = data.get('rows')
+            except Exception as e:
+                logger.error(f"Error reading history meta, discarding stored rows: {str(e)}", exc_info=True)
+                self.meta = {kind: [] for kind in KINDS}
+                rows = 0
+
+        # Only rows present in every column and recorded in meta are committed
+        shortest = min(self._column_length(column) for column in COLUMNS)
+        self.rows = shortest if rows is None else min(rows, shortest)
+        self._truncate_columns(self.rows)
+        self._ids = {
+            kind: {name: i for i, name in enumerate(self.meta[kind])}
+            for kind in KINDS
+        }
+
+        self.aggregates = None
+        if os.path.exists(self._aggregates_path):
+            try:
+                with open(self._aggregates_path, 'r') as f:
+                    data = json.load(f)
+                if data.get('window') == self.window and data.get('rows') == self.rows:
+                    self.aggregates = data['players']
+            except Exception as e:
+                logger.error(f"Error reading aggregates: {str(e)}", exc_info=True)
+        if self.aggregates is None:
+            logger.info("Aggregates missing or stale, rebuilding from columns")
+            try:
+                self.rebuild_aggregates()
+            except Exception as e:
+                logger.error(f"Error rebuilding aggregates: {str(e)}", exc_info=True)
+                self.aggregates = {}
+
+    def _save_meta(self):
+        self._write_json(self._meta_path, dict(self.meta, rows=self.rows))
+
+    def _save_aggregates(self):
+        self._write_json(self._aggregates_path, {
+            'window': self.window,
+            'rows': self.rows,
+            'updated': datetime.now().isoformat(),
+            'players': self.aggregates
+        })
+
+    def _intern(self, kind: str, name: str) -> int:
+        """Map a string to its stable integer id, assigning one if new"""
+        ids = self._ids[kind]
+        if name not in ids:
+            ids[name] = len(self.meta[kind])
+            self.meta[kind].append(name)
+        return ids[name]
+
+    def row_count(self) -> int:
+        """Number of committed innings rows"""
+        return self.rows
+
+    def read_column(self, column: str) -> array:
+        """
+        Memory-map a column file and copy its committed rows into an array
+        """
+        values = array(COLUMNS[column])
+        path = self._column_path(column)
+        size = self.rows * values.itemsize
+        if size == 0 or not os.path.exists(path):
+            return values
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            values.frombytes(mapped[:size])
+        return values
+
+    def _empty_aggregate(self) -> Dict[str, Any]:
+        return {'innings': 0, 'total_points': 0.0, 'last_points': [],
+                'venues': {}, 'opponents': {}}
+
+    def _update_aggregate(self, player: str, venue: str, opponent: str, points: float):
+        """Fold one innings into a player's rolling aggregates"""
+        agg = self.aggregates.setdefault(player, self._empty_aggregate())
+        agg['innings'] += 1
+        agg['total_points'] += points
+        agg['last_points'] = (agg['last_points'] + [points])[-self.window:]
+        for split, key in (('venues', venue), ('opponents', opponent)):
+            count, total = agg[split].get(key, [0, 0.0])
+            agg[split][key] = [count + 1, total + points]
+
+    def rebuild_aggregates(self):
+        """
+        Recompute all rolling aggregates from the column files
+        """
+        self.aggregates = {}
+        player_ids = self.read_column('player_id')
+        venue_ids = self.read_column('venue_id')
+        opponent_ids = self.read_column('opponent_id')
+        points = self.read_column('points')
+        players, venues, opponents = self.meta['players'], self.meta['venues'], self.meta['opponents']
+        skipped = 0
+        for i in range(self.rows):
+            p, v, o = player_ids[i], venue_ids[i], opponent_ids[i]
+            if not (0 <= p < len(players) and 0 <= v < len(venues) and 0 <= o < len(opponents)):
+                skipped += 1
+                continue
+            self._update_aggregate(players[p], venues[v], opponents[o], points[i])
+        if skipped:
+            logger.warning(f"Skipped {skipped} history rows with unknown ids")
+
+    def _prepare_innings(self, innings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate and convert scorecard entries without touching store state"""
+        prepared = []
+        for entry in innings:
+            row = {'name': str(entry['name']), 'opponent': str(entry['opponent'])}
+            for column in STAT_COLUMNS:
+                row[column] = _to_int(entry.get(column))
+            points = entry.get('points')
+            if points is None:
+                points = self.scorer(row) if self.scorer else 0.0
+            row['points'] = float(points)
+            prepared.append(row)
+        return prepared
+
+    def _rollback(self, meta_lengths: Dict[str, int]):
+        """Undo an ingest that failed before meta.json was committed"""
+        for kind, length in meta_lengths.items():
+            del self.meta[kind][length:]
+        self._ids = {
+            kind: {name: i for i, name in enumerate(self.meta[kind])}
+            for kind in KINDS
+        }
+        self._truncate_columns(self.rows)
+        self.rebuild_aggregates()
+
+    def ingest_scorecard(self, match_key: str, venue: str, innings: List[Dict[str, Any]]) -> int:
+        """
+        Append per-innings stats from a scorecard and update rolling aggregates.
+
+        Each innings dict needs 'name' and 'opponent' plus any of the stat
+        columns; 'points' is computed with the scorer when not supplied.
+        Returns the number of rows written (0 if the match was already ingested).
+        Raises before changing anything if an entry can't be converted.
+        """
+        if match_key in self._ids['matches']:
+            logger.info(f"Scorecard already ingested: {match_key}")
+            return 0
+
+        prepared = self._prepare_innings(innings)
+        meta_lengths = {kind: len(self.meta[kind]) for kind in KINDS}
+        committed_rows = self.rows
+        try:
+            match_id = self._intern('matches', match_key)
+            venue_id = self._intern('venues', venue)
+            rows = {column: array(typecode) for column, typecode in COLUMNS.items()}
+            for row in prepared:
+                rows['player_id'].append(self._intern('players', row['name']))
+                rows['match_id'].append(match_id)
+                rows['venue_id'].append(venue_id)
+                rows['opponent_id'].append(self._intern('opponents', row['opponent']))
+                for column in STAT_COLUMNS + ['points']:
+                    rows[column].append(row[column])
+
+            for column, values in rows.items():
+                with open(self._column_path(column), 'ab') as f:
+                    f.write(values.tobytes())
+            self.rows += len(prepared)
+            self._save_meta()
+        except Exception:
+            logger.error(f"Failed to ingest {match_key}, rolling back", exc_info=True)
+            self.rows = committed_rows
+            self._rollback(meta_lengths)
+            raise
+
+        for row in prepared:
+            self._update_aggregate(row['name'], venue, row['opponent'], row['points'])
+        self._save_aggregates()
+        logger.info(f"Ingested {len(prepared)} innings for {match_key}")
+        return len(prepared)
+
+    def get_form(self, player: str, venue: str = None, opponent: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Get precomputed form features for a player, or None if unknown
+        """
+        agg = self.aggregates.get(player)
+        if not agg:
+            return None
+
+        form = {
+            'innings': agg['innings'],
+            'last_points': list(agg['last_points']),
+            'recent_average': sum(agg['last_points']) / len(agg['last_points']),
+            'career_average': agg['total_points'] / agg['innings'],
+        }
+        for label, split, key in (('venue', 'venues', venue), ('opponent', 'opponents', opponent)):
+            if key and key in agg[split]:
+                count, total = agg[split][key]
+                form[f'{label}_innings'] = count
+                form[f'{label}_average'] = total / count
+        return form
@@ -0,0 +1,121 @@
+"""
+Fingerprinted response cache for the extension API
+"""
+
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Container, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def normalize_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Build a stable cache key from an endpoint and its request parameters"""
+    return f"{endpoint}:{json.dumps(params, sort_keys=True, separators=(',', ':'))}"
+
+
+def fingerprint(body: bytes) -> str:
+    """Deterministic ETag value for a serialized response body"""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def parse_request_params(method: str, args: Dict[str, str], body: Any) -> Dict[str, Any]:
+    """
+    Read parameters from the JSON body (POST) or the query string (GET).
+    Raises ValueError for malformed input.
+    """
+    if method == 'GET':
+        params = dict(args)
+        if 'options' in params:
+            try:
+                params['options'] = json.loads(params['options'])
+            except json.JSONDecodeError:
+                raise ValueError('options must be valid JSON')
+    else:
+        params = body or {}
+        if not isinstance(params, dict):
+            raise ValueError('Request body must be a JSON object')
+    if not isinstance(params.get('options', {}), dict):
+        raise ValueError('options must be a JSON object')
+    return params
+
+
+def parse_team_pair(params: Dict[str, Any]) -> Tuple[str, str]:
+    """Validate and normalize team1/team2, raising ValueError when invalid"""
+    if 'team1' not in params or 'team2' not in params:
+        raise ValueError('Invalid request data')
+    if not isinstance(params['team1'], str) or not isinstance(params['team2'], str):
+        raise ValueError('team1 and team2 must be strings')
+    return params['team1'].strip().upper(), params['team2'].strip().upper()
+
+
+def conditional_response(entry: Dict[str, Any], if_none_match: Container[str],
+                         accept_gzip: bool) -> Tuple[int, Optional[bytes], Dict[str, str]]:
+    """
+    Pick the status, body and headers for serving a cached entry.
+
+    Each content-coding gets its own strong validator: the gzip body is
+    tagged '<etag>-gzip'. A match on either tag returns 304.
+    """
+    gzip_etag = f"{entry['etag']}-gzip"
+    use_gzip = entry['gzip'] is not None and accept_gzip
+    headers = {
+        'ETag': f'"{gzip_etag if use_gzip else entry["etag"]}"',
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+    }
+    if entry['etag'] in if_none_match or gzip_etag in if_none_match:
+        return 304, None, headers
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        return 200, entry['gzip'], headers
+    return 200, entry['body'], headers
+
+
+class ResponseCache:
+    def __init__(self, expiry: int = 3600, max_entries: int = 128, gzip_min_size: int = 1024):
+        logger.info("Initializing ResponseCache")
+        self.expiry = expiry
+        self.max_entries = max_entries
+        self.gzip_min_size = gzip_min_size
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Flask serves requests on multiple threads
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response entry if it exists and hasn't expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if time.time() - entry['timestamp'] > self.expiry:
+                logger.debug(f"Response cache expired for key: {key}")
+                del self._entries[key]
+                return None
+        logger.info(f"Response cache hit for key: {key}")
+        return entry
+
+    def set(self, key: str, data: Any) -> Dict[str, Any]:
+        """
+        Serialize data once, fingerprint it and keep the body (and a gzipped
+        copy for large bodies) ready to be served on repeat requests
+        """
+        body = json.dumps(data, sort_keys=True).encode('utf-8')
+        entry = {
+            'timestamp': time.time(),
+            'etag': fingerprint(body),
+            'body': body,
+            'gzip': gzip.compress(body) if len(body) >= self.gzip_min_size else None,
+        }
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]['timestamp'])
+                del self._entries[oldest]
+            self._entries[key] = entry
+        logger.debug(f"Cached response for key: {key} (etag {entry['etag']})")
+        return entry
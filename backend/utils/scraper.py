@@ -7,11 +7,13 @@ import sys
 import logging
 import json
 import hashlib
+import re
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from backend.config.firecrawl_config import FIRECRAWL_CONFIG, FANTASY_CONFIG
+from backend.utils.match_parser import parse_match_page, parse_scorecard
 import requests
 
 # Configure logging
@@ -120,10 +122,56 @@ class FirecrawlScraper:
         logger.info(f"Scrape successful, data cached for {url}")
         return data
 
+    def scrape_match(self, url: str, options: dict = None) -> dict:
+        """Scrape a match page and return the parsed squads, with caching."""
+        options = options or {}
+        cache_key = f"parsed_{url}_{json.dumps(options, sort_keys=True)}"
+        cached_data = self.cache.get(cache_key)
+        if cached_data:
+            logger.info(f"Returning cached parsed match for {url}")
+            return cached_data
+
+        raw = self.scrape_url(url, options)
+        page = raw.get('data', raw)
+        content = page.get('markdown') or page.get('html') or ''
+        parsed = parse_match_page(content, FANTASY_CONFIG.get('default_credits', 8.0))
+        parsed['match']['url'] = url
+        self.cache.set(cache_key, parsed)
+        logger.info(f"Parsed {len(parsed['players'])} players from {url}")
+        return parsed
+
+    def scrape_scorecard(self, url: str, history, options: dict = None) -> dict:
+        """Scrape a scorecard page and ingest finished matches into a PlayerHistoryStore."""
+        options = options or {}
+        cache_key = f"scorecard_{url}_{json.dumps(options, sort_keys=True)}"
+        parsed = self.cache.get(cache_key)
+        if not parsed:
+            raw = self.scrape_url(url, options)
+            page = raw.get('data', raw)
+            parsed = parse_scorecard(page.get('markdown') or page.get('html') or '')
+            if parsed['match']['result']:
+                self.cache.set(cache_key, parsed)
+
+        parsed['ingested'] = 0
+        if not parsed['match']['result']:
+            logger.info(f"Match not finished yet, not ingesting scorecard for {url}")
+            return parsed
+        if not parsed['innings']:
+            logger.warning(f"No player stats found in scorecard for {url}")
+            return parsed
+
+        # Live and scorecard URLs for the same match share the Cricbuzz match id
+        match_id = re.search(r'/(\d+)/', url)
+        match_key = f"cricbuzz:{match_id.group(1)}" if match_id else url
+        parsed['ingested'] = history.ingest_scorecard(
+            match_key, parsed['match']['venue'] or 'Unknown', parsed['innings'])
+        return parsed
+
+
 def get_match_data(query: str) -> Dict[str, Any]:
     """
     Get match data for a specific query
     """
     logger.info(f"Getting match data for query: {query}")
     scraper = FirecrawlScraper()
-    return scraper.scrape_url(query)
+    return scraper.scrape_match(query)
@@ -2,15 +2,17 @@ from typing import Dict, List, Any
 import openai
 import os
 from backend.config.firecrawl_config import FANTASY_CONFIG, SCORING_CONFIG
+from backend.utils.player_history import PlayerHistoryStore
 
 class TeamBuilderAgent:
-    def __init__(self):
+    def __init__(self, history: PlayerHistoryStore = None):
         self.config = FANTASY_CONFIG
         self.max_credits = self.config['max_credits']
         self.team_size = self.config['team_size']
         self.max_per_team = self.config['max_per_team']
         self.role_constraints = self.config['role_constraints']
         self.scoring_config = SCORING_CONFIG
+        self.history = history or PlayerHistoryStore(scorer=self.calculate_player_score)
 
     def validate_team_constraints(self, team: List[Dict]) -> bool:
         """
@@ -75,11 +77,30 @@ class TeamBuilderAgent:
         
         return score
 
+    def apply_history_form(self, players: List[Dict], match: Dict[str, Any] = None) -> List[Dict]:
+        """
+        Fill recent_form and last_3_matches from the local player-history store
+        """
+        match = match or {}
+        venue = match.get('venue')
+        teams = (match.get('team1'), match.get('team2'))
+        for player in players:
+            opponent = None
+            if player.get('team') in teams:
+                opponent = teams[1] if player['team'] == teams[0] else teams[0]
+            form = self.history.get_form(player['name'], venue=venue, opponent=opponent)
+            if not form:
+                continue
+            player['last_3_matches'] = form['last_points'][-3:]
+            player['recent_form'] = round(form['recent_average'], 2)
+            player['history'] = form
+        return players
+
     def select_captain_vice_captain(self, team: List[Dict]) -> tuple:
         """
         Select captain and vice-captain based on form
         """
-        # Sort by form and return top 2 players
+        # Sort by form (filled from history by apply_history_form) and return top 2 players
         sorted_team = sorted(team, key=lambda x: sum(x.get('last_3_matches', [0])), reverse=True)
         return sorted_team[0], sorted_team[1]
 
@@ -88,6 +109,7 @@ def build_fantasy_team(match_data: Dict[str, Any]) -> Dict[str, Any]:
     Main function to build fantasy team
     """
     agent = TeamBuilderAgent()
+    agent.apply_history_form(match_data['players'], match_data.get('match'))
     
     # TODO: Implement actual team building logic using LLM
     # For now, return a mock team
@@ -8,16 +8,14 @@ class FirecrawlClient {
     async scrapeUrl(url, options = {}) {
         console.log('Scraping URL:', url);
         try {
-            const response = await fetch(`${this.baseUrl}/api/scrape`, {
-                method: 'POST',
+            // GET lets the browser revalidate with If-None-Match on repeat scrapes.
+            // Only the URL is sent: options like `selectors` were never forwarded to
+            // Firecrawl and are not valid /v1/scrape fields.
+            const params = new URLSearchParams({ url });
+            const response = await fetch(`${this.baseUrl}/api/scrape?${params}`, {
                 headers: {
-                    'Content-Type': 'application/json',
                     'X-API-Key': this.apiKey
-                },
-                body: JSON.stringify({
-                    url,
-                    ...options
-                })
+                }
             });
 
             if (!response.ok) {
@@ -222,11 +220,8 @@ class FantasyTeamBuilder {
 
 // Step 1: Scrape Cricbuzz homepage
 async function getCricbuzzHomepage() {
-    const response = await fetch('http://localhost:3000/api/scrape', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ url: 'https://www.cricbuzz.com' })
-    });
+    const params = new URLSearchParams({ url: 'https://www.cricbuzz.com' });
+    const response = await fetch(`http://localhost:3000/api/scrape?${params}`);
     const data = await response.json();
     return data.data?.html || data.html || '';
 }
@@ -248,11 +243,8 @@ async function getBestMatchUrlFromGemini(homepageHtml, userQuery) {
 
 // Step 3: Scrape selected match URL
 async function getMatchPageHtml(matchUrl) {
-    const response = await fetch('http://localhost:3000/api/scrape', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ url: matchUrl })
-    });
+    const params = new URLSearchParams({ url: matchUrl });
+    const response = await fetch(`http://localhost:3000/api/scrape?${params}`);
     const data = await response.json();
     return data.data?.html || data.html || '';
 }
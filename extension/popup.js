@@ -83,16 +83,9 @@ document.addEventListener('DOMContentLoaded', function() {
         showLoading();
 
         try {
-            const response = await fetch('http://localhost:3000/build-team', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    team1: team1,
-                    team2: team2
-                })
-            });
+            // GET lets the browser revalidate with If-None-Match instead of rebuilding
+            const params = new URLSearchParams({ team1: team1, team2: team2 });
+            const response = await fetch(`http://localhost:3000/build-team?${params}`);
 
             if (!response.ok) {
                 throw new Error('Failed to build team');